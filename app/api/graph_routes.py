@@ -1,18 +1,42 @@
 # app/api/graph_routes.py
 from __future__ import annotations
 
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional, Any
 
-from fastapi import APIRouter, HTTPException
+import anyio
+import orjson
+from fastapi import APIRouter, HTTPException, Response
 from pydantic import BaseModel
 
 from app.engine.models import Graph
 from app.engine.registry import get_node
-from app.engine.store import save_graph, get_graph, create_run, get_run
+from app.engine.store import save_graph, get_graph, create_run, get_run, get_run_status, mark_watched
 from app.engine.executor import run_graph
+from app.api.responses import ORJSONResponse
 
 router = APIRouter()
 
+# Dedicated thread limiter for graph runs, so CPU-bound runs don't queue
+# behind the default threadpool shared by every sync route.
+RUN_THREADS = (os.cpu_count() or 1) * 2
+_run_limiter: Optional[anyio.CapacityLimiter] = None
+
+
+def _get_run_limiter() -> anyio.CapacityLimiter:
+    # created lazily: a CapacityLimiter must be built inside the event loop
+    global _run_limiter
+    if _run_limiter is None:
+        _run_limiter = anyio.CapacityLimiter(RUN_THREADS)
+    return _run_limiter
+
+
+# Worker pool for /run_batch; one thread per core by default
+BATCH_MAX_WORKERS = os.cpu_count() or 1
+_batch_executor = ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS, thread_name_prefix="graph-batch")
+
 
 # -------------
 # Pydantic models
@@ -83,6 +107,13 @@ def create_graph(payload: GraphCreateRequest):
             detail=f"start_node '{payload.start_node}' must be in 'nodes'",
         )
 
+    for source, target in payload.edges.items():
+        if target is not None and target not in node_funcs:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Edge '{source}' -> '{target}' must point to a node in 'nodes'",
+            )
+
     graph = Graph(
         id=payload.graph_id,
         nodes=node_funcs,
@@ -99,30 +130,66 @@ def create_graph(payload: GraphCreateRequest):
     )
 
 
-@router.post("/run", response_model=GraphRunResponse)
-def run_graph_endpoint(payload: GraphRunRequest):
-    """
-    Run an existing graph synchronously and persist the run.
-    """
+def _get_graph_or_404(graph_id: str) -> Graph:
     try:
-        graph = get_graph(payload.graph_id)
+        return get_graph(graph_id)
     except KeyError:
         raise HTTPException(
             status_code=404,
-            detail=f"Graph '{payload.graph_id}' not found",
+            detail=f"Graph '{graph_id}' not found",
         )
 
-    # Normal run: persists to RUNS store
+
+def _run_one(payload: GraphRunRequest) -> Dict[str, Any]:
+    """
+    Blocking body of a single run: create the run record, execute
+    the graph and collect the final status.
+
+    Returns a plain dict in the GraphRunResponse shape; the routes
+    serialize it with orjson instead of validating it again.
+    """
+    graph = _get_graph_or_404(payload.graph_id)
+
+    # Normal run: persists to the runs database
     run_id = create_run(graph.id, payload.initial_state)
     final_state, log = run_graph(graph, payload.initial_state, run_id=run_id)
-    run_record = get_run(run_id)
 
-    return GraphRunResponse(
-        run_id=run_id,
-        final_state=final_state,
-        log=log,
-        status=run_record["status"],
+    return {
+        "run_id": run_id,
+        "final_state": final_state,
+        "log": [entry._asdict() for entry in log],
+        "status": get_run_status(run_id),
+    }
+
+
+@router.post("/run", response_model=GraphRunResponse)
+async def run_graph_endpoint(payload: GraphRunRequest) -> ORJSONResponse:
+    """
+    Run an existing graph and persist the run.
+
+    The executor itself is blocking, so it runs in a worker thread.
+    """
+    result = await anyio.to_thread.run_sync(_run_one, payload, limiter=_get_run_limiter())
+    return ORJSONResponse(result)
+
+
+@router.post("/run_batch", response_model=list[GraphRunResponse])
+async def run_graph_batch(payload: list[GraphRunRequest]) -> ORJSONResponse:
+    """
+    Run several graphs in one request.
+
+    Runs execute concurrently on the batch worker pool; results are
+    returned in the same order as the requests.
+    """
+    # Fail before starting anything if a graph is unknown
+    for item in payload:
+        _get_graph_or_404(item.graph_id)
+
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(
+        *(loop.run_in_executor(_batch_executor, _run_one, item) for item in payload)
     )
+    return ORJSONResponse(results)
 
 
 @router.get("/state/{run_id}", response_model=GraphRunStateResponse)
@@ -131,6 +198,7 @@ def get_run_state(run_id: str):
     Get current state + log of a given run.
     """
     try:
+        mark_watched(run_id)
         run_record = get_run(run_id)
     except KeyError:
         raise HTTPException(
@@ -138,10 +206,13 @@ def get_run_state(run_id: str):
             detail=f"Run '{run_id}' not found",
         )
 
-    return GraphRunStateResponse(
-        run_id=run_record["id"],
-        graph_id=run_record["graph_id"],
-        state=run_record["state"],
-        log=run_record["log"],
-        status=run_record["status"],
-    )
+    # State and log are stored JSON-encoded, so the body is built directly
+    # instead of decoding them and re-validating via the model.
+    content = orjson.dumps({
+        "run_id": run_record["id"],
+        "graph_id": run_record["graph_id"],
+        "state": orjson.Fragment(run_record["state_json"]),
+        "log": orjson.Fragment(run_record["log_json"]),
+        "status": run_record["status"],
+    })
+    return Response(content=content, media_type="application/json")
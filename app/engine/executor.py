@@ -1,22 +1,61 @@
 # app/engine/executor.py
 from __future__ import annotations
 
+import hashlib
+import threading
 import time
-from typing import Tuple, List, Optional
+from typing import Dict, Tuple, List, Optional
+
+import orjson
 
 from app.engine.models import Graph, State, ExecutionLogEntry
-from app.engine.store import update_run
+from app.engine.store import has_watcher, index_graph, update_run
+
+
+# (graph id, digest of initial state) -> (graph, encoded final state, log, encoded log)
+# for completed runs; lets repeated analysis of unchanged input skip execution.
+# The state is kept encoded so every hit decodes a fresh, unshared copy.
+_RUN_CACHE: Dict[Tuple[str, str], Tuple[Graph, bytes, List[ExecutionLogEntry], List[bytes]]] = {}
+_RUN_CACHE_MAX = 256
+
+# max_steps is user-supplied and unbounded, so only this many log slots
+# are preallocated; longer runs append past it
+_LOG_PREALLOC_MAX = 256
+
+# how often (seconds) a running graph re-checks whether a client has started
+# watching it; has_watcher is a locked SQLite read, too costly for every step
+_WATCHER_RECHECK_S = 0.05
+# runs execute on several worker threads (see api.graph_routes)
+_run_cache_lock = threading.Lock()
+
+
+def _run_cache_key(graph: Graph, initial_state: State) -> Optional[Tuple[str, str]]:
+    try:
+        encoded = orjson.dumps(initial_state, option=orjson.OPT_SORT_KEYS)
+    except TypeError:
+        # not JSON-serializable, can't be fingerprinted -> no caching
+        return None
+    return graph.id, hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+_SUMMARY_KEYS = frozenset({"quality_score", "iteration", "issues", "complexity_report"})
 
 
 def _summarise_state(state: State) -> str:
+    present = state.keys() & _SUMMARY_KEYS
+    if not present:
+        return "state updated"
+
     parts = []
-    if "quality_score" in state:
+    if "quality_score" in present:
         parts.append(f"quality_score={state['quality_score']}")
-    if "iteration" in state:
+    if "iteration" in present:
         parts.append(f"iteration={state['iteration']}")
-    if "issues" in state and isinstance(state["issues"], list):
-        parts.append(f"issues={len(state['issues'])}")
-    if "complexity_report" in state:
+    if "issues" in present:
+        issues = state["issues"]
+        if isinstance(issues, list):
+            parts.append(f"issues={len(issues)}")
+    if "complexity_report" in present:
         cr = state["complexity_report"]
         est = cr.get("estimated_complexity")
         fn_count = cr.get("function_count")
@@ -34,35 +73,71 @@ def run_graph(graph: Graph, initial_state: State, run_id: Optional[str] = None)
     - default edges
     - optional override: state["_next_node"]
     - termination: no next node OR state["_finished"] is True
-    """
-    state: State = dict(initial_state)  # copy to avoid mutating caller
-    state.setdefault("iteration", 0)
-    log: List[ExecutionLogEntry] = []
 
-    current_node_id = graph.start_node_id
+    Completed runs are cached by graph and initial state, so running the
+    same graph on the same input again returns the stored result.
+    """
+    cache_key = _run_cache_key(graph, initial_state)
+    cached = None
+    if cache_key is not None:
+        with _run_cache_lock:
+            cached = _RUN_CACHE.get(cache_key)
+    # a re-created graph with the same id must not reuse old results
+    if cached is not None and cached[0] is graph:
+        _, cached_state, cached_log, cached_log_json = cached
+        state, log = orjson.loads(cached_state), list(cached_log)
+        if run_id is not None:
+            update_run(run_id, state, log, "completed", list(cached_log_json))
+        return state, log
+
+    # shallow copy to avoid mutating caller; values (e.g. the code string)
+    # are shared, only the key table is cloned
+    state: State = {"iteration": 0, **initial_state}
+    # preallocated up to max_steps and truncated to the executed steps on exit
+    log: List[Optional[ExecutionLogEntry]] = [None] * min(graph.max_steps, _LOG_PREALLOC_MAX)
+    # entries pre-encoded as JSON when the run is persisted
+    log_json: List[bytes] = []
+
+    if not graph._node_index:
+        index_graph(graph)
+    node_index = graph._node_index
+    node_ids = graph._node_ids
+    nodes_list = graph._nodes_list
+    edges_list = graph._edges_list
+
+    current_idx: Optional[int] = node_index[graph.start_node_id]
     step = 0
 
     status = "running"
 
-    while current_node_id is not None and step < graph.max_steps:
+    watched = run_id is not None and has_watcher(run_id)
+    next_watch_check = time.monotonic() + _WATCHER_RECHECK_S
+
+    while current_idx is not None and step < graph.max_steps:
         step += 1
-        node = graph.nodes[current_node_id]
+        node = nodes_list[current_idx]
 
-        start_time = time.perf_counter()
+        start_ns = time.perf_counter_ns()
         state = node(state)  # node mutates and/or returns new state
-        duration_ms = (time.perf_counter() - start_time) * 1000.0
+        duration_ns = time.perf_counter_ns() - start_ns
 
-        entry: ExecutionLogEntry = {
-            "step": step,
-            "node_id": current_node_id,
-            "duration_ms": duration_ms,
-            "summary": _summarise_state(state),
-        }
-        log.append(entry)
+        entry = ExecutionLogEntry(step, node_ids[current_idx], duration_ns, _summarise_state(state))
+        if step <= len(log):
+            log[step - 1] = entry
+        else:
+            log.append(entry)
 
-        # Update run status mid-flight if run_id is provided
         if run_id is not None:
-            update_run(run_id, state, log, status)
+            log_json.append(orjson.dumps(entry._asdict()))
+
+            # Update run status mid-flight, only while a client is reading the run;
+            # the final state is always written below. Watching never stops once
+            # started, so only an unwatched run needs re-checking.
+            if not watched and time.monotonic() >= next_watch_check:
+                watched = has_watcher(run_id)
+                next_watch_check = time.monotonic() + _WATCHER_RECHECK_S
+            if watched:
+                update_run(run_id, state, log[:step], status, log_json)
 
         # Check for termination flag
         if state.get("_finished"):
@@ -72,16 +147,32 @@ def run_graph(graph: Graph, initial_state: State, run_id: Optional[str] = None)
         # Check for explicit next node override
         next_node_override = state.pop("_next_node", None)
         if next_node_override is not None:
-            current_node_id = next_node_override
+            current_idx = node_index[next_node_override]
         else:
             # Default edge-based transition
-            current_node_id = graph.edges.get(current_node_id)
+            current_idx = edges_list[current_idx]
 
     else:
         # loop ended by max_steps or no current_node
-        status = "completed" if current_node_id is None else "max_steps_reached"
+        status = "completed" if current_idx is None else "max_steps_reached"
+
+    del log[step:]
 
     if run_id is not None:
-        update_run(run_id, state, log, status)
+        update_run(run_id, state, log, status, log_json)
+
+    if status == "completed" and cache_key is not None:
+        try:
+            encoded_state = orjson.dumps(state)
+        except TypeError:
+            # e.g. integers beyond 64 bits; such runs simply aren't cached
+            encoded_state = None
+        if encoded_state is not None:
+            if not log_json:
+                log_json = [orjson.dumps(entry._asdict()) for entry in log]
+            with _run_cache_lock:
+                if len(_RUN_CACHE) >= _RUN_CACHE_MAX:
+                    _RUN_CACHE.pop(next(iter(_RUN_CACHE)), None)
+                _RUN_CACHE[cache_key] = (graph, encoded_state, list(log), list(log_json))
 
     return state, log
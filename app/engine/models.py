@@ -1,18 +1,18 @@
 # app/engine/models.py
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Optional, TypedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
 
 
 State = Dict[str, Any]
 NodeCallable = Callable[[State], State]
 
 
-class ExecutionLogEntry(TypedDict):
+class ExecutionLogEntry(NamedTuple):
     step: int
     node_id: str
-    duration_ms: float
+    duration_ns: int  # converted to ms only for display
     summary: str
 
 
@@ -26,3 +26,9 @@ class Graph:
     edges: Dict[str, Optional[str]]       # node_id -> next_node_id (or None to stop)
     start_node_id: str
     max_steps: int = 100
+
+    # Integer-indexed view of nodes/edges, built by store.save_graph()
+    _node_index: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _node_ids: List[str] = field(default_factory=list, init=False, repr=False)
+    _nodes_list: List[NodeCallable] = field(default_factory=list, init=False, repr=False)
+    _edges_list: List[Optional[int]] = field(default_factory=list, init=False, repr=False)
@@ -1,54 +1,263 @@
 # app/engine/store.py
 from __future__ import annotations
 
-from typing import Dict, Any
-from datetime import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional
+from datetime import datetime, timezone
+
+import orjson
 
 from app.engine.models import Graph, State, ExecutionLogEntry
+from app.engine.registry import get_node
 
 
-# Simple in-memory stores
+# Graphs hold Python callables, so each worker keeps its own built copy.
+# Their specs (node ids, edges, ...) live in SQLite next to the runs; a
+# worker rebuilds a graph from its spec when another worker created or
+# replaced it.
 GRAPHS: Dict[str, Graph] = {}
-RUNS: Dict[str, Dict[str, Any]] = {}
+# graph id -> revision of the spec the copy in GRAPHS was built from
+_graph_revisions: Dict[str, int] = {}
+
+# Runs live in SQLite so every worker process sees the same runs.
+# WAL mode lets readers poll while a run is being written.
+RUNS_DB_PATH = os.environ.get("CODEX_RUNS_DB", "runs.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS graphs (
+    id TEXT PRIMARY KEY,
+    revision INTEGER NOT NULL,
+    spec BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    graph_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    has_watcher INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS run_blobs (
+    run_id INTEGER PRIMARY KEY REFERENCES runs(id),
+    state BLOB NOT NULL,
+    log BLOB NOT NULL
+);
+"""
+
+_MAX_ROW_ID = 2**63 - 1
+
+_db: Optional[sqlite3.Connection] = None
+# one connection shared by the worker threads of this process
+_db_lock = threading.RLock()
+
+
+def _connect() -> sqlite3.Connection:
+    global _db
+    if _db is None:
+        db = sqlite3.connect(RUNS_DB_PATH, isolation_level=None, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.executescript(_SCHEMA)
+        _db = db
+    return _db
+
+
+@contextmanager
+def _transaction() -> Iterator[sqlite3.Connection]:
+    with _db_lock:
+        db = _connect()
+        db.execute("BEGIN")
+        try:
+            yield db
+            db.execute("COMMIT")
+        except BaseException:
+            # also covers a failed COMMIT (e.g. SQLITE_BUSY), so the shared
+            # connection is never left inside an open transaction
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+
+
+def _row_id(run_id: str) -> int:
+    # run ids are "run_<rowid>"
+    prefix, _, number = run_id.partition("_")
+    # ASCII digits only, within SQLite's signed 64-bit INTEGER range
+    if prefix != "run" or not (number.isascii() and number.isdecimal()) or len(number) > 19:
+        raise KeyError(f"Run '{run_id}' not found")
+    row_id = int(number)
+    if row_id > _MAX_ROW_ID:
+        raise KeyError(f"Run '{run_id}' not found")
+    return row_id
+
+
+def _dumps(value: Any) -> bytes:
+    try:
+        return orjson.dumps(value)
+    except orjson.JSONEncodeError:
+        # orjson rejects e.g. integers beyond 64 bits; the stdlib handles them
+        return json.dumps(value).encode()
+
+
+def _iso(ts: float) -> str:
+    # naive UTC ISO string, same format as datetime.utcnow().isoformat()
+    return datetime.fromtimestamp(ts, tz=timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def index_graph(graph: Graph) -> None:
+    """
+    Flatten the node/edge dicts into integer-indexed lists so the
+    executor can step through the graph without dict lookups.
+    """
+    node_ids = list(graph.nodes)
+    node_index = {node_id: i for i, node_id in enumerate(node_ids)}
+
+    edges_list = []
+    for node_id in node_ids:
+        next_node_id = graph.edges.get(node_id)
+        if next_node_id is not None and next_node_id not in node_index:
+            raise KeyError(f"Edge '{node_id}' -> '{next_node_id}' points to an unknown node")
+        edges_list.append(None if next_node_id is None else node_index[next_node_id])
+
+    graph._node_index = node_index
+    graph._node_ids = node_ids
+    graph._nodes_list = [graph.nodes[node_id] for node_id in node_ids]
+    graph._edges_list = edges_list
+
+
+def _build_graph(graph_id: str, spec: Dict[str, Any]) -> Graph:
+    graph = Graph(
+        id=graph_id,
+        nodes={node_id: get_node(node_id) for node_id in spec["nodes"]},
+        edges=spec["edges"],
+        start_node_id=spec["start_node_id"],
+        max_steps=spec["max_steps"],
+    )
+    index_graph(graph)
+    return graph
 
 
 def save_graph(graph: Graph) -> None:
-    GRAPHS[graph.id] = graph
+    index_graph(graph)
+    spec = {
+        "nodes": list(graph.nodes),
+        "edges": graph.edges,
+        "start_node_id": graph.start_node_id,
+        "max_steps": graph.max_steps,
+    }
+    with _transaction() as db:
+        db.execute(
+            "INSERT INTO graphs (id, revision, spec) VALUES (?, 1, ?)"
+            " ON CONFLICT (id) DO UPDATE SET revision = revision + 1, spec = excluded.spec",
+            (graph.id, _dumps(spec)),
+        )
+        (revision,) = db.execute("SELECT revision FROM graphs WHERE id = ?", (graph.id,)).fetchone()
+        GRAPHS[graph.id] = graph
+        _graph_revisions[graph.id] = revision
 
 
 def get_graph(graph_id: str) -> Graph:
-    graph = GRAPHS.get(graph_id)
-    if graph is None:
-        raise KeyError(f"Graph '{graph_id}' not found")
+    with _db_lock:
+        row = _connect().execute("SELECT revision, spec FROM graphs WHERE id = ?", (graph_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"Graph '{graph_id}' not found")
+        revision, spec = row
+        graph = GRAPHS.get(graph_id)
+        if graph is None or _graph_revisions.get(graph_id) != revision:
+            # created or replaced by another worker since we last built it
+            graph = _build_graph(graph_id, json.loads(spec))
+            GRAPHS[graph_id] = graph
+            _graph_revisions[graph_id] = revision
     return graph
 
 
 def create_run(graph_id: str, initial_state: State) -> str:
-    run_id = f"run_{len(RUNS) + 1}"
-    now = datetime.utcnow().isoformat()
-    RUNS[run_id] = {
-        "id": run_id,
-        "graph_id": graph_id,
-        "state": initial_state,
-        "log": [],  # list[ExecutionLogEntry]
-        "status": "created",
-        "created_at": now,
-        "updated_at": now,
-    }
-    return run_id
+    now = time.time()
+    with _transaction() as db:
+        cur = db.execute(
+            "INSERT INTO runs (graph_id, status, created_at, updated_at) VALUES (?, ?, ?, ?)",
+            (graph_id, "created", now, now),
+        )
+        db.execute(
+            "INSERT INTO run_blobs (run_id, state, log) VALUES (?, ?, ?)",
+            (cur.lastrowid, _dumps(initial_state), b"[]"),
+        )
+    return f"run_{cur.lastrowid}"
+
+
+def update_run(
+    run_id: str,
+    state: State,
+    log: list[ExecutionLogEntry],
+    status: str,
+    log_json: Optional[list[bytes]] = None,
+) -> None:
+    row_id = _row_id(run_id)
+    if log_json is None:
+        log_json = [orjson.dumps(entry._asdict()) for entry in log]
+    # entries are already encoded, so the log blob is just their JSON array
+    log_blob = b"[" + b",".join(log_json) + b"]"
 
+    with _transaction() as db:
+        cur = db.execute(
+            "UPDATE runs SET status = ?, updated_at = ? WHERE id = ?",
+            (status, time.time(), row_id),
+        )
+        if cur.rowcount == 0:
+            raise KeyError(f"Run '{run_id}' not found")
+        db.execute(
+            "UPDATE run_blobs SET state = ?, log = ? WHERE run_id = ?",
+            (_dumps(state), log_blob, row_id),
+        )
 
-def update_run(run_id: str, state: State, log: list[ExecutionLogEntry], status: str) -> None:
-    if run_id not in RUNS:
+
+def mark_watched(run_id: str) -> None:
+    row_id = _row_id(run_id)
+    with _db_lock:
+        cur = _connect().execute("UPDATE runs SET has_watcher = 1 WHERE id = ?", (row_id,))
+    if cur.rowcount == 0:
+        raise KeyError(f"Run '{run_id}' not found")
+
+
+def has_watcher(run_id: str) -> bool:
+    row_id = _row_id(run_id)
+    with _db_lock:
+        row = _connect().execute("SELECT has_watcher FROM runs WHERE id = ?", (row_id,)).fetchone()
+    return row is not None and bool(row[0])
+
+
+def get_run_status(run_id: str) -> str:
+    row_id = _row_id(run_id)
+    with _db_lock:
+        row = _connect().execute("SELECT status FROM runs WHERE id = ?", (row_id,)).fetchone()
+    if row is None:
         raise KeyError(f"Run '{run_id}' not found")
-    RUNS[run_id]["state"] = state
-    RUNS[run_id]["log"] = log
-    RUNS[run_id]["status"] = status
-    RUNS[run_id]["updated_at"] = datetime.utcnow().isoformat()
+    return row[0]
 
 
 def get_run(run_id: str) -> Dict[str, Any]:
-    run = RUNS.get(run_id)
-    if run is None:
+    row_id = _row_id(run_id)
+    with _db_lock:
+        row = _connect().execute(
+            "SELECT r.graph_id, r.status, r.created_at, r.updated_at, b.state, b.log"
+            " FROM runs r JOIN run_blobs b ON b.run_id = r.id WHERE r.id = ?",
+            (row_id,),
+        ).fetchone()
+    if row is None:
         raise KeyError(f"Run '{run_id}' not found")
-    return run
+
+    graph_id, status, created_at_ts, updated_at_ts, state, log_json = row
+    # timestamps are kept as floats and only formatted when read
+    return {
+        "id": run_id,
+        "graph_id": graph_id,
+        "state_json": state,  # encoded; decode with json.loads to keep big integers exact
+        "log_json": log_json,  # JSON array of the log entries, still encoded
+        "status": status,
+        "created_at": _iso(created_at_ts),
+        "updated_at": _iso(updated_at_ts),
+    }
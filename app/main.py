@@ -4,6 +4,7 @@ from fastapi.responses import RedirectResponse
 from fastapi.staticfiles import StaticFiles
 
 from app.api.graph_routes import router as graph_router
+from app.api.responses import ORJSONResponse
 from app.workflows.code_review import register_default_workflow
 
 
@@ -13,7 +14,8 @@ from app.workflows.code_review import register_default_workflow
 app = FastAPI(
     title="Workflow Engine - Code Review Mini Agent",
     version="1.0.0",
-    description="A minimal stateful workflow engine for code quality analysis."
+    description="A minimal stateful workflow engine for code quality analysis.",
+    default_response_class=ORJSONResponse,
 )
 
 
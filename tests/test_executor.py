@@ -0,0 +1,130 @@
+# tests/test_executor.py
+from __future__ import annotations
+
+import orjson
+import pytest
+
+from app.engine import executor, store
+from app.engine.executor import _LOG_PREALLOC_MAX, run_graph
+from app.engine.models import Graph, State
+
+
+@pytest.fixture
+def runs_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, "RUNS_DB_PATH", str(tmp_path / "runs.db"))
+    monkeypatch.setattr(store, "_db", None)
+    yield
+    if store._db is not None:
+        store._db.close()
+
+
+@pytest.fixture
+def run_cache(monkeypatch):
+    monkeypatch.setattr(executor, "_RUN_CACHE", {})
+    return executor._RUN_CACHE
+
+
+def _finish(state: State) -> State:
+    state["_finished"] = True
+    return state
+
+
+def _again(state: State) -> State:
+    state["count"] = state.get("count", 0) + 1
+    state["_next_node"] = "again"
+    return state
+
+
+def _counting_graph(calls: list, graph_id: str = "cached") -> Graph:
+    def analyze(state: State) -> State:
+        calls.append(state.get("code"))
+        state["issues"] = [{"type": "todo", "line": 1}]
+        state["_finished"] = True
+        return state
+
+    return Graph(id=graph_id, nodes={"analyze": analyze}, edges={}, start_node_id="analyze")
+
+
+def test_huge_max_steps_does_not_preallocate():
+    # the log must not be sized by max_steps up front
+    for max_steps in (10**9, 2**62):
+        graph = Graph(id="huge", nodes={"finish": _finish}, edges={}, start_node_id="finish", max_steps=max_steps)
+        state, log = run_graph(graph, {"code": "x"})
+
+        assert state["_finished"] is True
+        assert [entry.node_id for entry in log] == ["finish"]
+
+
+def test_log_grows_past_preallocation():
+    max_steps = _LOG_PREALLOC_MAX + 10
+    graph = Graph(id="again", nodes={"again": _again}, edges={}, start_node_id="again", max_steps=max_steps)
+    state, log = run_graph(graph, {})
+
+    assert state["count"] == max_steps
+    assert [entry.step for entry in log] == list(range(1, max_steps + 1))
+
+
+def test_watcher_flag_is_not_read_every_step(runs_db, monkeypatch):
+    calls = []
+
+    def has_watcher(run_id):
+        calls.append(run_id)
+        return False
+
+    monkeypatch.setattr(executor, "has_watcher", has_watcher)
+    monkeypatch.setattr(executor, "_WATCHER_RECHECK_S", 3600)
+    graph = Graph(id="again", nodes={"again": _again}, edges={}, start_node_id="again", max_steps=50)
+    run_id = store.create_run(graph.id, {})
+    run_graph(graph, {}, run_id=run_id)
+
+    assert calls == [run_id]
+    assert store.get_run_status(run_id) == "max_steps_reached"
+
+
+def test_cache_hit_returns_unshared_copy(run_cache):
+    calls = []
+    graph = _counting_graph(calls)
+    state, log = run_graph(graph, {"code": "x"})
+    state["issues"][0]["type"] = "mutated"
+    state["issues"].append("extra")
+    log.clear()
+
+    again, again_log = run_graph(graph, {"code": "x"})
+
+    assert calls == ["x"]
+    assert again["issues"] == [{"type": "todo", "line": 1}]
+    assert [entry.node_id for entry in again_log] == ["analyze"]
+
+
+def test_cache_hit_records_completed_run(runs_db, run_cache):
+    calls = []
+    graph = _counting_graph(calls)
+    run_graph(graph, {"code": "x"})
+    run_id = store.create_run(graph.id, {"code": "x"})
+
+    state, _ = run_graph(graph, {"code": "x"}, run_id=run_id)
+
+    assert calls == ["x"]
+    run = store.get_run(run_id)
+    assert run["status"] == "completed"
+    assert orjson.loads(run["state_json"]) == state
+    assert [entry["node_id"] for entry in orjson.loads(run["log_json"])] == ["analyze"]
+
+
+def test_recreated_graph_misses_cache(run_cache):
+    calls = []
+    run_graph(_counting_graph(calls), {"code": "x"})
+    run_graph(_counting_graph(calls), {"code": "x"})
+
+    assert calls == ["x", "x"]
+
+
+def test_unserializable_input_is_not_cached(run_cache):
+    calls = []
+    graph = _counting_graph(calls)
+    marker = object()
+    run_graph(graph, {"code": "x", "marker": marker})
+    run_graph(graph, {"code": "x", "marker": marker})
+
+    assert calls == ["x", "x"]
+    assert not run_cache
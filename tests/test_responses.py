@@ -0,0 +1,16 @@
+# tests/test_responses.py
+from __future__ import annotations
+
+import json
+
+from app.api.responses import ORJSONResponse
+
+
+def test_render_matches_json():
+    content = {"run_id": "run_1", "log": [{"step": 1}], "final_state": {"score": 90}}
+    assert json.loads(ORJSONResponse(content).body) == content
+
+
+def test_render_falls_back_for_big_integers():
+    content = {"final_state": {"n": 100000000000000000000000}}
+    assert json.loads(ORJSONResponse(content).body) == content
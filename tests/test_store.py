@@ -0,0 +1,154 @@
+# tests/test_store.py
+from __future__ import annotations
+
+import json
+import sqlite3
+
+import orjson
+import pytest
+
+from app.engine import registry, store
+from app.engine.models import ExecutionLogEntry, Graph, State
+
+
+@pytest.fixture(autouse=True)
+def runs_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, "RUNS_DB_PATH", str(tmp_path / "runs.db"))
+    monkeypatch.setattr(store, "_db", None)
+    monkeypatch.setattr(store, "GRAPHS", {})
+    monkeypatch.setattr(store, "_graph_revisions", {})
+    yield
+    if store._db is not None:
+        store._db.close()
+
+
+def test_create_and_get_run():
+    run_id = store.create_run("g", {"code": "x"})
+    run = store.get_run(run_id)
+
+    assert run["id"] == run_id
+    assert run["graph_id"] == "g"
+    assert json.loads(run["state_json"]) == {"code": "x"}
+    assert run["log_json"] == b"[]"
+    assert run["status"] == "created"
+    assert store.get_run_status(run_id) == "created"
+
+
+def test_run_ids_are_unique():
+    assert store.create_run("g", {}) != store.create_run("g", {})
+
+
+def test_update_run_stores_state_and_encoded_log():
+    run_id = store.create_run("g", {})
+    log = [ExecutionLogEntry(1, "extract", 1000, "state updated")]
+    store.update_run(run_id, {"quality_score": 90}, log, "completed")
+
+    run = store.get_run(run_id)
+    assert json.loads(run["state_json"]) == {"quality_score": 90}
+    assert orjson.loads(run["log_json"]) == [log[0]._asdict()]
+    assert run["status"] == "completed"
+
+
+def test_watcher_flag():
+    run_id = store.create_run("g", {})
+    assert not store.has_watcher(run_id)
+    store.mark_watched(run_id)
+    assert store.has_watcher(run_id)
+
+
+def test_state_with_big_integers_round_trips():
+    big = 100000000000000000000000
+    run_id = store.create_run("g", {"n": big})
+    store.update_run(run_id, {"n": big, "m": -big}, [], "completed")
+
+    assert json.loads(store.get_run(run_id)["state_json"]) == {"n": big, "m": -big}
+
+
+@pytest.mark.parametrize(
+    "run_id",
+    ["run_99", "foo", "run_", "run_x", "run_²", "run_１", "run_99999999999999999999999", "run_9223372036854775808"],
+)
+def test_unknown_run_ids_raise_key_error(run_id):
+    store.create_run("g", {})
+    with pytest.raises(KeyError):
+        store.get_run(run_id)
+    with pytest.raises(KeyError):
+        store.get_run_status(run_id)
+    with pytest.raises(KeyError):
+        store.mark_watched(run_id)
+    with pytest.raises(KeyError):
+        store.update_run(run_id, {}, [], "completed")
+
+
+def test_failed_commit_leaves_no_open_transaction(monkeypatch):
+    run_id = store.create_run("g", {})
+    db = store._connect()
+
+    class FailingCommit:
+        # proxy that fails COMMIT like SQLITE_BUSY would
+        def execute(self, sql, *args):
+            if sql == "COMMIT":
+                raise sqlite3.OperationalError("database is locked")
+            return db.execute(sql, *args)
+
+        @property
+        def in_transaction(self):
+            return db.in_transaction
+
+    connect = store._connect
+    monkeypatch.setattr(store, "_connect", lambda: FailingCommit())
+    with pytest.raises(sqlite3.OperationalError):
+        store.update_run(run_id, {"a": 1}, [], "completed")
+    monkeypatch.setattr(store, "_connect", connect)
+
+    assert not db.in_transaction
+    store.update_run(run_id, {"a": 2}, [], "completed")
+    assert json.loads(store.get_run(run_id)["state_json"]) == {"a": 2}
+
+
+def _finish(state: State) -> State:
+    state["_finished"] = True
+    return state
+
+
+def _forget_graphs(monkeypatch):
+    # what a freshly started worker sees
+    monkeypatch.setattr(store, "GRAPHS", {})
+    monkeypatch.setattr(store, "_graph_revisions", {})
+
+
+def test_graph_is_rebuilt_from_its_spec(monkeypatch):
+    monkeypatch.setitem(registry.NODE_REGISTRY, "finish", _finish)
+    store.save_graph(Graph(id="g", nodes={"finish": _finish}, edges={"finish": None}, start_node_id="finish", max_steps=7))
+    _forget_graphs(monkeypatch)
+
+    graph = store.get_graph("g")
+
+    assert graph.nodes == {"finish": _finish}
+    assert graph.edges == {"finish": None}
+    assert graph.start_node_id == "finish"
+    assert graph.max_steps == 7
+    assert graph._node_ids == ["finish"]
+    assert store.get_graph("g") is graph
+
+
+def test_graph_replaced_elsewhere_is_rebuilt(monkeypatch):
+    monkeypatch.setitem(registry.NODE_REGISTRY, "finish", _finish)
+    store.save_graph(Graph(id="g", nodes={"finish": _finish}, edges={}, start_node_id="finish", max_steps=7))
+    old = store.get_graph("g")
+
+    # another worker re-creates the graph: same id, new spec
+    graphs, revisions = store.GRAPHS, store._graph_revisions
+    _forget_graphs(monkeypatch)
+    store.save_graph(Graph(id="g", nodes={"finish": _finish}, edges={}, start_node_id="finish", max_steps=3))
+    monkeypatch.setattr(store, "GRAPHS", graphs)
+    monkeypatch.setattr(store, "_graph_revisions", revisions)
+
+    graph = store.get_graph("g")
+    assert graph is not old
+    assert graph.max_steps == 3
+
+
+def test_unknown_graph_raises_key_error():
+    with pytest.raises(KeyError):
+        store.get_graph("missing")